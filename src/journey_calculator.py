@@ -1,11 +1,16 @@
 import os
+import atexit
+import csv
+import functools
+import io
+import itertools
 import logging
-from dataclasses import dataclass, field
-from datetime import datetime, time
-from typing import Dict, List, Tuple
-import requests
-import pandas as pd
-from dotenv import load_dotenv
+import shelve
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import astuple, dataclass, field
+from datetime import datetime, time, timedelta
+from typing import ClassVar, Dict, List, Optional, Tuple
 
 # Set up logging
 logging.basicConfig(
@@ -14,13 +19,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Parent:
     name: str
-    addresses: List[Tuple[str, str]]  # List of (concise_name, full_address)
-    availability: Dict[str, Tuple[time, time]]  # Day of week to (start_time, end_time)
+    addresses: Tuple[Tuple[str, str], ...]  # (concise_name, full_address) pairs
+    availability: Tuple[Tuple[str, Tuple[time, time]], ...]  # (day of week, (start_time, end_time)) pairs
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class School:
     name: str  # Full name
     concise_name: str  # Abbreviated name
@@ -31,91 +36,249 @@ class School:
     aftercare_end: time
     source: str = ""
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Child:
     name: str
-    schools: List[School]  # Allow multiple school options
+    schools: Tuple[School, ...]  # Allow multiple school options
+
+@dataclass(slots=True)
+class ScenarioResult:
+    scenario_name: str
+    parent: str
+    parent_address: str  # Concise address name
+    children: str
+    fenella_school: str
+    schools: str
+    time_of_day: str
+    total_journey_time: Optional[int]  # Minutes, None if a leg could not be resolved
+    journey_details: List[Dict]
+
+    CSV_COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'Scenario Name', 'Parent', 'Parent Address', 'Children', 'Fenella School',
+        'Schools', 'Time of Day', 'Total Journey Time (mins)', 'Journey Details'
+    )
+
+class JourneyAPIError(Exception):
+    """Raised when the Distance Matrix API cannot provide a journey time."""
 
 # Utils
 class GoogleMapsClient:
+    DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+    MAX_MATRIX_ADDRESSES = 25  # Per-request limit on origins and on destinations
+    MAX_MATRIX_ELEMENTS = 100  # Per-request limit on origins x destinations
+    MAX_CONCURRENT_REQUESTS = 10  # Stay well inside Google's QPS limit
+    CACHE_PATH = '.journey_cache.db'
+    CACHE_TTL = timedelta(days=30)
+    CACHE_BUCKET_MINUTES = 15  # Departure times within the same bucket share cached traffic estimates
+    REQUEST_TIMEOUT = 5  # Seconds
+
     def __init__(self):
+        from dotenv import load_dotenv
+
         load_dotenv()
         self.api_key = os.getenv("GOOGLE_MAPS_API_KEY")
         if not self.api_key:
             raise ValueError("Google Maps API key not found in .env file")
         self.journey_times_cache = {}
+        self._cache = shelve.open(self.CACHE_PATH, writeback=False)
+        atexit.register(self._cache.close)
+        self._session = None
         logger.info("GoogleMapsClient initialized successfully")
 
-    def get_journey_time(self, origin: str, destination: str) -> int:
-        """Get journey time between two locations using Google Maps API."""
+    @property
+    def session(self):
+        """HTTP session, created on the first cache miss so fully cached runs never import requests."""
+        return self._ensure_session()
+
+    def _ensure_session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            # Reuse TLS connections to the Maps API across requests and worker threads
+            self._session = requests.Session()
+            self._session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32))
+            self._session.headers.update({'Connection': 'keep-alive'})
+            atexit.register(self._session.close)
+        return self._session
+
+    @classmethod
+    def _cache_key(cls, origin: str, destination: str, departure_time: Optional[datetime]) -> str:
+        # Traffic varies by time of day, so cached journeys are only reused within the same departure bucket
+        departure_time = departure_time or datetime.now()
+        bucket = (departure_time.hour, departure_time.minute // cls.CACHE_BUCKET_MINUTES)
+        return f"{origin}|{destination}|{bucket[0]}:{bucket[1]}"
+
+    def _get_cached(self, origin: str, destination: str, departure_time: Optional[datetime]) -> Optional[int]:
+        """Look up a journey time in memory, then in the on-disk cache."""
+        cache_key = self._cache_key(origin, destination, departure_time)
+        if cache_key in self.journey_times_cache:
+            return self.journey_times_cache[cache_key]
+
+        entry = self._cache.get(cache_key)
+        if entry is None:
+            return None
+        minutes, cached_at = entry
+        if datetime.now() - cached_at > self.CACHE_TTL:
+            return None
+        self.journey_times_cache[cache_key] = minutes
+        return minutes
+
+    def _set_cached(self, origin: str, destination: str, departure_time: Optional[datetime], minutes: int):
+        cache_key = self._cache_key(origin, destination, departure_time)
+        self.journey_times_cache[cache_key] = minutes
+        self._cache[cache_key] = (minutes, datetime.now())
+
+    def _request_matrix(self, params: Dict[str, str]) -> Dict:
+        import orjson
+        import requests
+
         try:
-            cache_key = (origin, destination)
-            if cache_key in self.journey_times_cache:
-                logger.debug(f"Using cached journey time for {cache_key}")
-                return self.journey_times_cache[cache_key]
-
-            logger.debug(f"Fetching journey time from {origin} to {destination}")
-
-            params = {
-                'origins': origin,
-                'destinations': destination,
-                'key': self.api_key,
-                'mode': 'driving',
-                'departure_time': 'now',
-                'traffic_model': 'best_guess'
-            }
+            response = self.session.get(self.DISTANCE_MATRIX_URL, params=params, timeout=self.REQUEST_TIMEOUT)
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
+            raise JourneyAPIError(f"Distance Matrix request failed: {str(e)}") from e
+
+    @staticmethod
+    def _departure_param(departure_time: Optional[datetime]):
+        return int(departure_time.timestamp()) if departure_time else 'now'
 
-            url = "https://maps.googleapis.com/maps/api/distancematrix/json"
-            response = requests.get(url, params=params)
-            data = response.json()
-
-            if (data.get('status') == 'OK' and
-                data.get('rows') and
-                data['rows'][0].get('elements') and
-                data['rows'][0]['elements'][0].get('status') == 'OK' and
-                'duration_in_traffic' in data['rows'][0]['elements'][0]):
-
-                duration = data['rows'][0]['elements'][0]['duration_in_traffic']['value']
-                minutes = duration // 60
-                self.journey_times_cache[cache_key] = minutes
-                logger.debug(f"Journey time: {minutes} minutes")
-                return minutes
-            else:
-                logger.error(f"Invalid response format or error status: {data}")
-                return 60  # Default to 60 minutes
-
-        except Exception as e:
-            logger.error(f"Error in get_journey_time: {str(e)}")
-            return 60  # Default to 60 minutes in case of any error
+    def get_journey_matrix(
+        self, origins: List[str], destinations: List[str], departure_time: Optional[datetime] = None
+    ) -> Dict[Tuple[str, str], int]:
+        """Get journey times for every origin/destination pair using as few API requests as possible."""
+        matrix = {}
+        missing = set()
+        for origin in origins:
+            for destination in destinations:
+                minutes = self._get_cached(origin, destination, departure_time)
+                if minutes is None:
+                    missing.add((origin, destination))
+                else:
+                    matrix[(origin, destination)] = minutes
+        if not missing:
+            logger.debug("Using cached journey matrix")
+            return matrix
+
+        # Only request the addresses that still have uncached pairs
+        origins = [o for o in origins if any((o, d) in missing for d in destinations)]
+        destinations = [d for d in destinations if any((o, d) in missing for o in origins)]
+
+        self._ensure_session()  # Create the session here rather than racing to create it in worker threads
+        tiles = []
+        for destination_tile in self._tiles(destinations, self.MAX_MATRIX_ADDRESSES):
+            origin_tile_size = min(self.MAX_MATRIX_ADDRESSES, self.MAX_MATRIX_ELEMENTS // len(destination_tile))
+            for origin_tile in self._tiles(origins, origin_tile_size):
+                tiles.append((origin_tile, destination_tile))
+
+        # Tiles are independent, so overlap their network latency
+        with ThreadPoolExecutor(max_workers=min(len(tiles), self.MAX_CONCURRENT_REQUESTS)) as executor:
+            for tile_matrix in executor.map(lambda tile: self._fetch_matrix_tile(*tile, departure_time), tiles):
+                matrix.update(tile_matrix)
+
+        # The shelf is not thread-safe, so write results back from this thread
+        for origin, destination in missing:
+            if (origin, destination) in matrix:
+                self._set_cached(origin, destination, departure_time, matrix[(origin, destination)])
+        return matrix
+
+    @staticmethod
+    def _tiles(addresses: List[str], size: int):
+        iterator = iter(addresses)
+        while tile := list(itertools.islice(iterator, size)):
+            yield tile
+
+    def _fetch_matrix_tile(
+        self, origins: List[str], destinations: List[str], departure_time: Optional[datetime]
+    ) -> Dict[Tuple[str, str], int]:
+        """Fetch a single Distance Matrix request and return every cell that resolved.
+
+        Raises JourneyAPIError if the request as a whole fails, since every other tile would fail the same way.
+        """
+        logger.debug(f"Fetching journey matrix for {len(origins)} origins x {len(destinations)} destinations")
+
+        params = {
+            'origins': '|'.join(origins),
+            'destinations': '|'.join(destinations),
+            'key': self.api_key,
+            'mode': 'driving',
+            'departure_time': self._departure_param(departure_time),
+            'traffic_model': 'best_guess'
+        }
+
+        data = self._request_matrix(params)
+
+        if data.get('status') != 'OK' or len(data.get('rows', [])) != len(origins):
+            raise JourneyAPIError(f"Invalid response format or error status: {data}")
+
+        matrix = {}
+        for origin, row in zip(origins, data['rows']):
+            for destination, element in zip(destinations, row.get('elements', [])):
+                if element.get('status') == 'OK' and 'duration_in_traffic' in element:
+                    matrix[(origin, destination)] = element['duration_in_traffic']['value'] // 60
+                else:
+                    logger.warning(f"No journey time from {origin} to {destination}: {element.get('status')}")
+        return matrix
 
 class JourneyCalculator:
+    MAX_EXHAUSTIVE_ROUTE_STOPS = 5  # 5! = 120 orderings; larger routes use a heuristic
+    DEPARTURE_TIMES = {'Drop-off': time(8, 0), 'Pick-up': time(14, 45)}  # When the school run leaves home
+
     def __init__(self):
         self.maps_client = GoogleMapsClient()
         self.parents = self._initialize_parents()
         self.schools = self._initialize_schools()
         self.children = self._initialize_children()
+        self.departure_times = {
+            time_of_day: self._next_school_day_at(departure)
+            for time_of_day, departure in self.DEPARTURE_TIMES.items()
+        }
+        self.journey_matrix = self._build_journey_matrix()
         logger.info("Initialization complete")
 
+    def _build_journey_matrix(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Journey times between every home and school, as time_of_day -> origin -> destination -> minutes."""
+        addrs = list(dict.fromkeys(
+            [address for parent in self.parents.values() for _, address in parent.addresses] +
+            [school.address for school in self.schools.values()]
+        ))
+        journey_matrix = {}
+        for time_of_day, departure_time in self.departure_times.items():
+            pairs = self.maps_client.get_journey_matrix(addrs, addrs, departure_time)
+            journey_matrix[time_of_day] = {origin: {} for origin in addrs}
+            for (origin, destination), minutes in pairs.items():
+                journey_matrix[time_of_day][origin][destination] = minutes
+        return journey_matrix
+
+    @staticmethod
+    def _next_school_day_at(departure: time) -> datetime:
+        """The next weekday departure in the future, which the traffic model requires."""
+        departure_time = datetime.combine(datetime.now().date(), departure)
+        while departure_time <= datetime.now() or departure_time.weekday() >= 5:
+            departure_time += timedelta(days=1)
+        return departure_time
+
     def _initialize_parents(self) -> Dict[str, Parent]:
-        weekday_availability = {
-            day: (time(7, 0), time(19, 0))
+        weekday_availability = tuple(
+            (day, (time(7, 0), time(19, 0)))
             for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-        }
+        )
 
         return {
             "David": Parent(
                 name="David",
-                addresses=[
-                    ("Islingword Rd", "39 Islingword Road, Brighton & Hove, East Sussex BN2 9SF")
-                ],
+                addresses=(
+                    ("Islingword Rd", sys.intern("39 Islingword Road, Brighton & Hove, East Sussex BN2 9SF")),
+                ),
                 availability=weekday_availability
             ),
             "Hannah": Parent(
                 name="Hannah",
-                addresses=[
-                    ("Chandlers Ford", "12 The Maples, Chandler's Ford, Eastleigh, Hampshire SO53 1DZ"),
-                    ("Petersfield", "Petersfield, UK")
-                ],
+                addresses=(
+                    ("Chandlers Ford", sys.intern("12 The Maples, Chandler's Ford, Eastleigh, Hampshire SO53 1DZ")),
+                    ("Petersfield", sys.intern("Petersfield, UK"))
+                ),
                 availability=weekday_availability
             )
         }
@@ -125,7 +288,7 @@ class JourneyCalculator:
             "St Luke's": School(
                 name="St Luke's",
                 concise_name="St Luke's",
-                address="Queens Park Rise, Brighton, BN2 9ZF",
+                address=sys.intern("Queens Park Rise, Brighton, BN2 9ZF"),
                 normal_start=time(8, 40),
                 normal_end=time(15, 15),
                 breakfast_club_start=time(8, 0),
@@ -134,7 +297,7 @@ class JourneyCalculator:
             "Lindfield": School(
                 name="Lindfield Primary Academy",
                 concise_name="Lindfield PA",
-                address="School Lane, Lindfield, Haywards Heath, RH16 2DX",
+                address=sys.intern("School Lane, Lindfield, Haywards Heath, RH16 2DX"),
                 normal_start=time(8, 45),
                 normal_end=time(15, 15),
                 breakfast_club_start=time(7, 0),
@@ -143,7 +306,7 @@ class JourneyCalculator:
             "Bedales": School(
                 name="Bedales",
                 concise_name="Bedales",
-                address="Alton Road, Petersfield, GU32 2DR",
+                address=sys.intern("Alton Road, Petersfield, GU32 2DR"),
                 normal_start=time(8, 30),
                 normal_end=time(15, 30),
                 breakfast_club_start=time(8, 0),
@@ -155,68 +318,45 @@ class JourneyCalculator:
         return {
             "Fenella": Child(
                 name="Fenella",
-                schools=[
+                schools=(
                     self.schools["Lindfield"],
                     self.schools["St Luke's"]
-                ]
+                )
             ),
             "Ruby": Child(
                 name="Ruby",
-                schools=[self.schools["Lindfield"]]
+                schools=(self.schools["Lindfield"],)
             ),
             "Teddy": Child(
                 name="Teddy",
-                schools=[self.schools["Bedales"]]
+                schools=(self.schools["Bedales"],)
             )
         }
 
     def calculate_permutations(self):
         results = []
-        scenarios = []
-
-        # For David
-        for david_address in self.parents["David"].addresses:
-            for fenella_school in self.children["Fenella"].schools:
-                # David has Fenella and Ruby
-                scenario = {
-                    'Parent': 'David',
-                    'Parent Address': david_address,
-                    'Children': ['Fenella', 'Ruby'],
-                    'Schools': [fenella_school, self.children["Ruby"].schools[0]],
-                }
-                scenarios.append(scenario)
-                # David has just Fenella
-                scenario = {
-                    'Parent': 'David',
-                    'Parent Address': david_address,
-                    'Children': ['Fenella'],
-                    'Schools': [fenella_school],
-                }
-                scenarios.append(scenario)
-
-        # For Hannah
-        for hannah_address in self.parents["Hannah"].addresses:
-            for fenella_school in self.children["Fenella"].schools:
-                # Hannah has Fenella and Teddy
-                scenario = {
-                    'Parent': 'Hannah',
-                    'Parent Address': hannah_address,
-                    'Children': ['Fenella', 'Teddy'],
-                    'Schools': [fenella_school, self.children["Teddy"].schools[0]],
-                }
-                scenarios.append(scenario)
-                # Hannah has just Fenella
-                scenario = {
-                    'Parent': 'Hannah',
-                    'Parent Address': hannah_address,
-                    'Children': ['Fenella'],
-                    'Schools': [fenella_school],
-                }
-                scenarios.append(scenario)
+
+        # Which children each parent may have at once
+        roster = {
+            'David': [['Fenella', 'Ruby'], ['Fenella']],
+            'Hannah': [['Fenella', 'Teddy'], ['Fenella']]
+        }
+        scenarios = [
+            {
+                'Parent': parent_name,
+                'Parent Address': address,
+                'Children': children,
+                'Schools': [fenella_school if child == 'Fenella' else self.children[child].schools[0] for child in children],
+            }
+            for parent_name, combos in roster.items()
+            for address, fenella_school, children in itertools.product(
+                self.parents[parent_name].addresses, self.children["Fenella"].schools, combos
+            )
+        ]
 
         # Calculate journey times for each scenario
         for scenario in scenarios:
-            for time_of_day in ['Drop-off', 'Pick-up']:
+            for time_of_day in self.departure_times:
                 result = self._calculate_journey(scenario, time_of_day)
                 results.append(result)
 
@@ -224,82 +364,129 @@ class JourneyCalculator:
 
     def _calculate_journey(self, scenario, time_of_day):
         parent = scenario['Parent']
-        parent_address_name, parent_address_full = scenario['Parent Address']
+        parent_address_name, home = scenario['Parent Address']
         children = scenario['Children']
-        schools = scenario['Schools']
-
-        # Build journey sequence
-        journey_sequence = []
-        journey_sequence.append(('Home', parent_address_full))
-        for school in schools:
-            journey_sequence.append((school.concise_name, school.address))
-        journey_sequence.append(('Return Home', parent_address_full))
-
-        # Calculate journey times between each point
-        total_journey_time = 0
-        journey_details = []
-        for i in range(len(journey_sequence) - 1):
-            start_label, start_addr = journey_sequence[i]
-            end_label, end_addr = journey_sequence[i + 1]
-            journey_time = self.maps_client.get_journey_time(start_addr, end_addr)
-            total_journey_time += journey_time
-            journey_details.append({
-                'From': start_label,
-                'To': end_label,
-                'Journey Time (mins)': journey_time
-            })
+
+        try:
+            # Plan the route per time of day, since traffic can change the best order
+            route = self._plan_route(home, scenario['Schools'], time_of_day)
+            journey_sequence = (
+                ('Home', home),
+                *((school.concise_name, school.address) for school in route),
+                ('Return Home', home)
+            )
+
+            # Calculate journey times between each point
+            total_journey_time, leg_times = self._sum_journey(tuple(addr for _, addr in journey_sequence), time_of_day)
+            journey_details = [
+                {
+                    'From': start_label,
+                    'To': end_label,
+                    'Journey Time (mins)': journey_time
+                }
+                for (start_label, _), (end_label, _), journey_time in zip(journey_sequence, journey_sequence[1:], leg_times)
+            ]
+        except JourneyAPIError as e:
+            logger.error(f"Could not calculate {time_of_day} journey for {parent} ({parent_address_name}): {str(e)}")
+            route = scenario['Schools']
+            total_journey_time = None
+            journey_details = []
+        route_names = [school.concise_name for school in route]
 
         # Build result
-        scenario_name = f"{parent} Home ({parent_address_name}) > " + " + ".join([s.concise_name for s in schools]) + f" {time_of_day}"
-        result = {
-            'Scenario Name': scenario_name,
-            'Parent': parent,
-            'Parent Address': parent_address_name,
-            'Children': ', '.join(children),
-            'Fenella School': schools[0].concise_name,
-            'Schools': ', '.join([s.concise_name for s in schools]),
-            'Time of Day': time_of_day,
-            'Total Journey Time (mins)': total_journey_time,
-            'Journey Details': journey_details
-        }
+        scenario_name = f"{parent} Home ({parent_address_name}) > " + " + ".join(route_names) + f" {time_of_day}"
+        result = ScenarioResult(
+            scenario_name=scenario_name,
+            parent=parent,
+            parent_address=parent_address_name,
+            children=', '.join(children),
+            fenella_school=scenario['Schools'][0].concise_name,
+            schools=', '.join(route_names),
+            time_of_day=time_of_day,
+            total_journey_time=total_journey_time,
+            journey_details=journey_details
+        )
 
-        logger.info(f"Calculated {time_of_day} journey for scenario: {result['Scenario Name']}")
+        logger.info(f"Calculated {time_of_day} journey for scenario: {result.scenario_name}")
         return result
 
+    def _leg_time(self, origin: str, destination: str, time_of_day: str) -> int:
+        try:
+            return self.journey_matrix[time_of_day][origin][destination]
+        except KeyError:
+            raise JourneyAPIError(f"No journey time from {origin} to {destination}") from None
+
+    @functools.lru_cache(maxsize=None)
+    def _sum_journey(self, addr_tuple: Tuple[str, ...], time_of_day: str) -> Tuple[int, Tuple[int, ...]]:
+        """Total and per-leg journey times along a sequence of addresses."""
+        leg_times = tuple(self._leg_time(a, b, time_of_day) for a, b in zip(addr_tuple, addr_tuple[1:]))
+        return sum(leg_times), leg_times
+
+    def _route_time(self, home: str, schools: List[School], time_of_day: str) -> int:
+        return self._sum_journey((home, *(school.address for school in schools), home), time_of_day)[0]
+
+    def _plan_route(self, home: str, schools: List[School], time_of_day: str) -> List[School]:
+        """Order the schools to minimise the round trip from home."""
+        if len(schools) <= self.MAX_EXHAUSTIVE_ROUTE_STOPS:
+            return list(min(
+                itertools.permutations(schools),
+                key=lambda route: self._route_time(home, route, time_of_day)
+            ))
+
+        # Nearest neighbour from home...
+        route = []
+        unvisited = list(schools)
+        current = home
+        while unvisited:
+            nearest = min(unvisited, key=lambda s: self._leg_time(current, s.address, time_of_day))
+            unvisited.remove(nearest)
+            route.append(nearest)
+            current = nearest.address
+
+        # ...then 2-opt until no segment reversal shortens the round trip
+        best_time = self._route_time(home, route, time_of_day)
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(route) - 1):
+                for j in range(i + 1, len(route)):
+                    candidate = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+                    candidate_time = self._route_time(home, candidate, time_of_day)
+                    if candidate_time < best_time:
+                        route, best_time = candidate, candidate_time
+                        improved = True
+        return route
+
     def output_table(self, results):
-        # Convert results to DataFrame
-        df = pd.DataFrame(results)
-        
-        # Order by Fenella's school selection
-        df['Fenella School Order'] = df['Fenella School'].map({'Lindfield PA': 1, "St Luke's": 2})
-        
-        # Order by Parent Address
+        # Order by Fenella's school selection, then by Parent Address
+        fenella_school_order = {'Lindfield PA': 1, "St Luke's": 2}
         address_order = {
             ('Hannah', 'Chandlers Ford'): 1,
             ('Hannah', 'Petersfield'): 2,
             ('David', 'Islingword Rd'): 3
         }
-        df['Parent Address Order'] = df.apply(lambda x: address_order.get((x['Parent'], x['Parent Address']), 4), axis=1)
-        
-        # Sort DataFrame
-        df = df.sort_values(['Fenella School Order', 'Parent Address Order'])
-        
-        # Select columns to display
-        display_columns = ['Scenario Name', 'Total Journey Time (mins)', 'Time of Day', 'Children']
+        results = sorted(results, key=lambda r: (
+            fenella_school_order.get(r.fenella_school, 3),
+            address_order.get((r.parent, r.parent_address), 4)
+        ))
         
-        # Print the table
-        print("\nPossible Journey Scenarios:")
-        print("-" * 100)
-        header = f"{'Scenario Name':<50}{'Total Time (mins)':<20}{'Time of Day':<15}{'Children':<20}"
-        print(header)
-        print("-" * 100)
-        for _, row in df.iterrows():
-            row_str = f"{row['Scenario Name']:<50}{row['Total Journey Time (mins)']:<20}{row['Time of Day']:<15}{row['Children']:<20}"
-            print(row_str)
-        print("-" * 100)
+        # Build the table and write it out in one go
+        report = io.StringIO()
+        report.write("\nPossible Journey Scenarios:\n")
+        report.write("-" * 100 + "\n")
+        report.write(f"{'Scenario Name':<50}{'Total Time (mins)':<20}{'Time of Day':<15}{'Children':<20}\n")
+        report.write("-" * 100 + "\n")
+        for row in results:
+            total_time = 'N/A' if row.total_journey_time is None else row.total_journey_time
+            report.write(f"{row.scenario_name:<50}{total_time:<20}{row.time_of_day:<15}{row.children:<20}\n")
+        report.write("-" * 100 + "\n")
+        sys.stdout.write(report.getvalue())
         
-        # Save DataFrame to CSV
-        df.to_csv('journey_scenarios.csv', index=False)
+        # Save results to CSV
+        with open('journey_scenarios.csv', 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(ScenarioResult.CSV_COLUMNS)
+            writer.writerows(astuple(row) for row in results)
 
     def run(self):
         results = self.calculate_permutations()
@@ -1,14 +1,22 @@
 # Combined implementation of all src files with requested modifications
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, date, time
+import functools
 import itertools
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+import atexit
 import logging
 import os
+import shelve
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+load_dotenv()
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,13 +25,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Models
-@dataclass
+@dataclass(slots=True)
 class Parent:
     name: str
     address: str
     availability: Dict[str, Tuple[time, time]]  # Day of week to (start_time, end_time)
 
-@dataclass
+@dataclass(slots=True)
 class School:
     name: str
     address: str
@@ -33,14 +41,14 @@ class School:
     aftercare_end: time
     source: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class Child:
     name: str
     schools: List[School]  # Allow multiple school options
     custody_schedule: Dict[int, Dict[int, Dict[str, Parent]]]  # Week -> Day -> {'AM': Parent, 'PM': Parent}
     overnight_schedule: Dict[int, Dict[int, Parent]] = field(default_factory=dict)  # Week -> Day -> Parent
 
-@dataclass
+@dataclass(slots=True)
 class ScheduleSlot:
     child: Child
     parent: Parent
@@ -48,89 +56,205 @@ class ScheduleSlot:
     time: datetime
     duration: int  # Duration in minutes for the drop-off/pick-up period
 
-@dataclass
+@dataclass(slots=True)
 class DaySchedule:
+    """A day's slots in time order, stored as parallel columns rather than ScheduleSlot objects."""
     date: date
-    slots: List[ScheduleSlot]
+    slot_child: Tuple[str, ...]  # Child name
+    slot_parent: Tuple[str, ...]  # Parent name
+    slot_school: Tuple[str, ...]  # School name
+    slot_dropoff: Tuple[bool, ...]
+    slot_minute: Tuple[int, ...]  # Slot start, in minutes from midnight
+    slot_duration: Tuple[int, ...]  # Minutes
     total_journey_time: int
+    window_misses: Tuple[str, ...] = ()  # School or availability windows the day's runs cannot meet
+
+    @classmethod
+    def from_slots(cls, date_obj: date, slots: List[ScheduleSlot], total_journey_time: int,
+                   window_misses: Tuple[str, ...] = ()) -> 'DaySchedule':
+        return cls(
+            date=date_obj,
+            slot_child=tuple(slot.child.name for slot in slots),
+            slot_parent=tuple(slot.parent.name for slot in slots),
+            slot_school=tuple(slot.child.schools[0].name for slot in slots),
+            slot_dropoff=tuple(slot.is_dropoff for slot in slots),
+            slot_minute=tuple(slot.time.hour * 60 + slot.time.minute for slot in slots),
+            slot_duration=tuple(slot.duration for slot in slots),
+            total_journey_time=total_journey_time,
+            window_misses=window_misses
+        )
 
-@dataclass
+@dataclass(slots=True)
 class TwoWeekSchedule:
     schedules: List[DaySchedule]
     total_journey_time: int
 
 # Utils
 class GoogleMapsClient:
-    def __init__(self):
-        load_dotenv()
-        self.api_key = os.getenv("GOOGLE_MAPS_API_KEY")
-        if not self.api_key:
-            raise ValueError("Google Maps API key not found in .env file")
-        self.journey_times_cache = {}
+    DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+    MAX_MATRIX_ADDRESSES = 25  # Per-request limit on origins and on destinations
+    MAX_MATRIX_ELEMENTS = 100  # Per-request limit on origins x destinations
+    CACHE_PATH = '.scheduler_cache.db'
+    CACHE_TTL = timedelta(days=30)
+    REQUEST_TIMEOUT = 5  # Seconds
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._shelf = shelve.open(self.CACHE_PATH)
+        self._shelf_lock = threading.Lock()  # Lookups may run on worker threads; shelve is not thread-safe
+        atexit.register(self._shelf.close)
+
+        # Reuse TLS connections to the Maps API across requests
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=10))
+        atexit.register(self.session.close)
         logger.info("GoogleMapsClient initialized successfully")
 
-    def get_journey_time(self, origin: str, destination: str, arrival_time: datetime = None) -> int:
+    def _get_cached(self, origin: str, destination: str) -> Optional[int]:
+        """Look up a journey time in the on-disk cache."""
+        with self._shelf_lock:
+            entry = self._shelf.get(f"{origin}|{destination}")
+        if entry is None:
+            return None
+        minutes, cached_at = entry
+        if datetime.now() - datetime.fromisoformat(cached_at) > self.CACHE_TTL:
+            return None
+        return minutes
+
+    def _set_cached(self, origin: str, destination: str, minutes: int):
+        with self._shelf_lock:
+            self._shelf[f"{origin}|{destination}"] = (minutes, datetime.now().isoformat())
+
+    def get_journey_time(self, origin: str, destination: str) -> int:
         """Get journey time between two locations using Google Maps API."""
         try:
-            cache_key = (origin, destination, arrival_time.isoformat() if arrival_time else None)
-            if cache_key in self.journey_times_cache:
-                logger.debug(f"Using cached journey time for {cache_key}")
-                return self.journey_times_cache[cache_key]
+            return self._fetch_journey_time(origin, destination)
+        except Exception as e:
+            logger.error("Error in get_journey_time: %s", e)
+            return 60  # Default to 60 minutes in case of any error
+
+    def _fetch_journey_time(self, origin: str, destination: str) -> int:
+        """Read a journey time from the on-disk cache, or fetch and store it.
+
+        Failures raise and are never stored, so the default get_journey_time falls back to is only
+        used for this run; the lookup is retried on the next run.
+        """
+        # Drop-off and pick-up times are fixed per school, so journeys are cached by route alone
+        minutes = self._get_cached(origin, destination)
+        if minutes is not None:
+            logger.debug("Using cached journey time for (%r, %r)", origin, destination)
+            return minutes
+
+        logger.debug("Fetching journey time from %s to %s", origin, destination)
+
+        params = {
+            'origins': origin,
+            'destinations': destination,
+            'key': self.api_key,
+            'mode': 'driving',
+            'traffic_model': 'best_guess',
+            'departure_time': 'now'
+        }
 
-            logger.debug(f"Fetching journey time from {origin} to {destination}")
+        response = self.session.get(self.DISTANCE_MATRIX_URL, params=params, timeout=self.REQUEST_TIMEOUT)
+        minutes = self._parse_matrix(response.json())[0][0]
+        if minutes is None:
+            raise ValueError(f"No journey time from {origin} to {destination}")
+        self._set_cached(origin, destination, minutes)
+        logger.debug("Journey time: %d minutes", minutes)
+        return minutes
+
+    @staticmethod
+    def _parse_matrix(data: dict) -> List[List[Optional[int]]]:
+        """Parse a Distance Matrix response into rows of journey minutes, with None for any failed element.
+
+        Raises ValueError if the response as a whole is not OK.
+        """
+        if data.get('status') != 'OK' or not data.get('rows'):
+            raise ValueError(f"Invalid response format or error status: {data}")
+        return [
+            [element['duration']['value'] // 60 if element.get('status') == 'OK' and 'duration' in element else None
+             for element in row.get('elements', [])]
+            for row in data['rows']
+        ]
+
+    def prefetch_matrix(self, locations: List[str]):
+        """Cache journey times between every pair of locations using as few API requests as possible."""
+        if all(self._get_cached(o, d) is not None for o in locations for d in locations):
+            logger.debug("Using cached journey matrix")
+            return
+
+        for destination_tile in self._tiles(locations, self.MAX_MATRIX_ADDRESSES):
+            origin_tile_size = min(self.MAX_MATRIX_ADDRESSES, self.MAX_MATRIX_ELEMENTS // len(destination_tile))
+            for origin_tile in self._tiles(locations, origin_tile_size):
+                self._fetch_matrix_tile(origin_tile, destination_tile)
+
+    @staticmethod
+    def _tiles(locations: List[str], size: int):
+        iterator = iter(locations)
+        while tile := list(itertools.islice(iterator, size)):
+            yield tile
+
+    def _fetch_matrix_tile(self, origins: List[str], destinations: List[str]):
+        try:
+            logger.debug("Fetching journey matrix for %d origins x %d destinations", len(origins), len(destinations))
 
             params = {
-                'origins': origin,
-                'destinations': destination,
+                'origins': '|'.join(origins),
+                'destinations': '|'.join(destinations),
                 'key': self.api_key,
                 'mode': 'driving',
                 'traffic_model': 'best_guess',
                 'departure_time': 'now'
             }
 
-            if arrival_time:
-                params['arrival_time'] = int(arrival_time.timestamp())
-
-            url = "https://maps.googleapis.com/maps/api/distancematrix/json"
-            response = requests.get(url, params=params)
-            data = response.json()
+            response = self.session.get(self.DISTANCE_MATRIX_URL, params=params, timeout=self.REQUEST_TIMEOUT)
+            rows = self._parse_matrix(response.json())
+            if len(rows) != len(origins):
+                logger.error("Expected %d rows in journey matrix, got %d", len(origins), len(rows))
+                return
 
-            if (data.get('status') == 'OK' and 
-                data.get('rows') and 
-                data['rows'][0].get('elements') and 
-                data['rows'][0]['elements'][0].get('status') == 'OK' and
-                'duration' in data['rows'][0]['elements'][0]):
-                
-                duration = data['rows'][0]['elements'][0]['duration']['value']
-                minutes = duration // 60
-                self.journey_times_cache[cache_key] = minutes
-                logger.debug(f"Journey time: {minutes} minutes")
-                return minutes
-            else:
-                logger.error(f"Invalid response format or error status: {data}")
-                return 60  # Default to 60 minutes
+            for origin, row in zip(origins, rows):
+                for destination, minutes in zip(destinations, row):
+                    if minutes is not None:
+                        self._set_cached(origin, destination, minutes)
+                    else:
+                        logger.warning("No journey time from %s to %s", origin, destination)
 
         except Exception as e:
-            logger.error(f"Error in get_journey_time: {str(e)}")
-            return 60  # Default to 60 minutes in case of any error
+            logger.error("Error in prefetch_matrix: %s", e)
 
 # Optimizer
 class ScheduleOptimizer:
     MAX_TRAVEL_TIME_PER_DAY = 240  # Increased to allow for the additional 15-minute periods
     MAX_TRAVEL_TIME_PER_WEEK = 1200  # Increased accordingly
+    MAX_LOOKUP_WORKERS = 8
+    DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
 
     def __init__(self):
-        # Load environment variables
-        load_dotenv()
         api_key = os.getenv("GOOGLE_MAPS_API_KEY")
         if not api_key:
             raise ValueError("Google Maps API key not found in environment variables")
         logger.info("API key loaded successfully")
         
-        self.maps_client = GoogleMapsClient()
+        self.maps_client = GoogleMapsClient(api_key)
+        self.executor = ThreadPoolExecutor(max_workers=self.MAX_LOOKUP_WORKERS)  # Overlaps uncached journey lookups
+        atexit.register(self.executor.shutdown)
         self.parents = self._initialize_parents()
         self.schools = self._initialize_schools()
         self.children = self._initialize_children()
+        # child name -> [week 1, week 2] -> day -> overnight parent name, for the schedule overview
+        self._overnight_table: Dict[str, List[List[str]]] = {
+            child_name: [[child.custody_schedule[week][day]['Overnight'].name for day in range(5)] for week in (1, 2)]
+            for child_name, child in self.children.items()
+        }
+        # Every journey is between a home and a school; give each an integer node ID into a minutes table
+        self._locations = list(dict.fromkeys(
+            [parent.address for parent in self.parents.values()] +
+            [school.address for school in self.schools.values()]
+        ))
+        self._node_id: Dict[str, int] = {address: i for i, address in enumerate(self._locations)}
+        self._dist: List[List[int]] = [[-1] * len(self._locations) for _ in self._locations]  # -1 until looked up
         logger.info("Initialization complete")
 
     def _initialize_parents(self) -> Dict[str, Parent]:
@@ -281,100 +405,135 @@ class ScheduleOptimizer:
                 }
         return teddy_schedule
 
-    def calculate_journey_time(self, start_location: str, end_location: str, arrival_time: datetime = None) -> int:
-        return self.maps_client.get_journey_time(start_location, end_location, arrival_time)
+    def _travel(self, origin: int, destination: int) -> int:
+        """Journey minutes between two node IDs, filling the table from the maps client on a miss."""
+        minutes = self._dist[origin][destination]
+        if minutes < 0:
+            minutes = self.maps_client.get_journey_time(self._locations[origin], self._locations[destination])
+            self._dist[origin][destination] = minutes
+        return minutes
 
     def generate_possible_day_schedules(self, date_obj: date, week_number: int, day_of_week: int) -> List[DaySchedule]:
         """Generate possible schedules for a given day considering all children's schedules."""
-        logger.info(f"Generating schedules for {date_obj}, Week {week_number}, Day {day_of_week}")
+        logger.info("Generating schedules for %s, Week %d, Day %d", date_obj, week_number, day_of_week)
+        
+        # Days with the same AM/PM parents for every child share the same optimal schedule
+        custody = tuple(
+            (self.children[name].custody_schedule[week_number][day_of_week]["AM"].name,
+             self.children[name].custody_schedule[week_number][day_of_week]["PM"].name)
+            for name in ("Fenella", "Ruby", "Teddy")
+        )
+        # Key on the parents' availability that day rather than the weekday, so repeated patterns share a result
+        day_name = self.DAY_NAMES[day_of_week]
+        availability = tuple(
+            (parent_name, self.parents[parent_name].availability.get(day_name))
+            for parent_name in sorted({parent_name for am_pm in custody for parent_name in am_pm})
+        )
+        school, total_journey_time, window_misses = self._select_fenella_school(custody, availability)
+        for window_miss in window_misses:
+            logger.warning("%s: %s", date_obj, window_miss)
+        
+        optimal_schedule = self._build_day_schedule(date_obj, school, total_journey_time, window_misses, custody)
+        logger.info("Selected optimal schedule for %s with journey time %d minutes", date_obj, optimal_schedule.total_journey_time)
+        return [optimal_schedule]
+
+    @functools.lru_cache(maxsize=None)
+    def _select_fenella_school(self, custody: Tuple[Tuple[str, str], ...],
+                               availability: Tuple[Tuple[str, Optional[Tuple[time, time]]], ...]
+                               ) -> Tuple[School, int, Tuple[str, ...]]:
+        """Pick Fenella's school with the minimal total journey time for a (Fenella, Ruby, Teddy) AM/PM custody tuple.
+
+        Options whose runs all meet their windows win over those that miss one; if every option misses a window,
+        the quickest is kept along with its misses. Journey times are cached by route, so the result depends
+        only on custody and each involved parent's (start, end) availability that day, or None if unavailable.
+        """
+        schools = self.children["Fenella"].schools
+        if len(schools) == 1:
+            return (schools[0], *self._solve_day_vrp(self._build_day_slots(schools[0], custody), availability))
         
         possible_schedules = []
-        fenella_custody = self.children["Fenella"].custody_schedule[week_number][day_of_week]
-        ruby_custody = self.children["Ruby"].custody_schedule[week_number][day_of_week]
-        teddy_custody = self.children["Teddy"].custody_schedule[week_number][day_of_week]
+        for school in schools:
+            total_journey_time, window_misses = self._solve_day_vrp(self._build_day_slots(school, custody), availability)
+            if window_misses:
+                logger.debug("No feasible routes with Fenella at %s for custody %s", school.name, custody)
+            possible_schedules.append((school, total_journey_time, window_misses))
         
-        # Generate schedules for each of Fenella's school options
-        for school in self.children["Fenella"].schools:
-            slots = []
-            
-            # Fenella's slots
-            fenella = Child(name="Fenella", schools=[school], custody_schedule={})
-            fenella_slot_am = ScheduleSlot(
-                child=fenella,
-                parent=fenella_custody["AM"],
-                is_dropoff=True,
-                time=None,
-                duration=15  # 15 minutes for drop-off
-            )
-            fenella_slot_pm = ScheduleSlot(
-                child=fenella,
-                parent=fenella_custody["PM"],
-                is_dropoff=False,
-                time=None,
-                duration=15  # 15 minutes for pick-up
-            )
-            slots.extend([fenella_slot_am, fenella_slot_pm])
-            
-            # Ruby's slots (fixed)
-            ruby = self.children["Ruby"]
-            ruby_slot_am = ScheduleSlot(
-                child=ruby,
-                parent=ruby_custody["AM"],
-                is_dropoff=True,
-                time=None,
-                duration=15
-            )
-            ruby_slot_pm = ScheduleSlot(
-                child=ruby,
-                parent=ruby_custody["PM"],
-                is_dropoff=False,
-                time=None,
-                duration=15
-            )
-            slots.extend([ruby_slot_am, ruby_slot_pm])
-            
-            # Teddy's slots (fixed)
-            teddy = self.children["Teddy"]
-            teddy_slot_am = ScheduleSlot(
-                child=teddy,
-                parent=teddy_custody["AM"],
-                is_dropoff=True,
-                time=None,
-                duration=15
-            )
-            teddy_slot_pm = ScheduleSlot(
-                child=teddy,
-                parent=teddy_custody["PM"],
-                is_dropoff=False,
-                time=None,
-                duration=15
-            )
-            slots.extend([teddy_slot_am, teddy_slot_pm])
-            
-            # Calculate times and journey durations
-            slots_with_times = self._calculate_slot_times(slots, date_obj)
-            total_journey_time = self._calculate_total_journey_time(slots_with_times)
-            
-            schedule = DaySchedule(
-                date=date_obj,
-                slots=slots_with_times,
-                total_journey_time=total_journey_time
-            )
-            possible_schedules.append(schedule)
+        # Select the schedule with the minimal total journey time, preferring those that meet every window
+        return min(possible_schedules, key=lambda s: (bool(s[2]), s[1]))
+
+    def _build_day_schedule(self, date_obj: date, school: School, total_journey_time: int,
+                            window_misses: Tuple[str, ...], custody: Tuple[Tuple[str, str], ...]) -> DaySchedule:
+        """Build a timed day schedule with Fenella at the given school."""
+        slots = self._calculate_slot_times(self._build_day_slots(school, custody), date_obj)
+        return DaySchedule.from_slots(date_obj, slots, total_journey_time, window_misses)
+
+    def _build_day_slots(self, school: School, custody: Tuple[Tuple[str, str], ...]) -> List[ScheduleSlot]:
+        """Build the drop-off and pick-up slots for a day, with Fenella at the given school."""
+        (fenella_am, fenella_pm), (ruby_am, ruby_pm), (teddy_am, teddy_pm) = custody
+        slots = []
         
-        # Select the schedule with the minimal total journey time
-        if possible_schedules:
-            optimal_schedule = min(possible_schedules, key=lambda s: s.total_journey_time)
-            logger.info(f"Selected optimal schedule for {date_obj} with journey time {optimal_schedule.total_journey_time} minutes")
-            return [optimal_schedule]
-        else:
-            logger.warning(f"No schedules generated for {date_obj}")
-            return []
+        # Fenella's slots
+        fenella = Child(name="Fenella", schools=[school], custody_schedule={})
+        fenella_slot_am = ScheduleSlot(
+            child=fenella,
+            parent=self.parents[fenella_am],
+            is_dropoff=True,
+            time=None,
+            duration=15  # 15 minutes for drop-off
+        )
+        fenella_slot_pm = ScheduleSlot(
+            child=fenella,
+            parent=self.parents[fenella_pm],
+            is_dropoff=False,
+            time=None,
+            duration=15  # 15 minutes for pick-up
+        )
+        slots.extend([fenella_slot_am, fenella_slot_pm])
+        
+        # Ruby's slots (fixed)
+        ruby = self.children["Ruby"]
+        ruby_slot_am = ScheduleSlot(
+            child=ruby,
+            parent=self.parents[ruby_am],
+            is_dropoff=True,
+            time=None,
+            duration=15
+        )
+        ruby_slot_pm = ScheduleSlot(
+            child=ruby,
+            parent=self.parents[ruby_pm],
+            is_dropoff=False,
+            time=None,
+            duration=15
+        )
+        slots.extend([ruby_slot_am, ruby_slot_pm])
+        
+        # Teddy's slots (fixed)
+        teddy = self.children["Teddy"]
+        teddy_slot_am = ScheduleSlot(
+            child=teddy,
+            parent=self.parents[teddy_am],
+            is_dropoff=True,
+            time=None,
+            duration=15
+        )
+        teddy_slot_pm = ScheduleSlot(
+            child=teddy,
+            parent=self.parents[teddy_pm],
+            is_dropoff=False,
+            time=None,
+            duration=15
+        )
+        slots.extend([teddy_slot_am, teddy_slot_pm])
+        
+        return slots
 
     def _calculate_slot_times(self, slots: List[ScheduleSlot], date_obj: date) -> List[ScheduleSlot]:
-        """Calculate exact times for each slot based on school times and travel."""
-        slots_with_times = []
-        
+        """Calculate exact times for each slot based on school times and travel.
+
+        Returns the slots in time order: every drop-off is in the morning and every pick-up in the afternoon,
+        so sorting each group and concatenating them orders the whole day.
+        """
         # Sort slots by is_dropoff and school start/end times
         dropoff_slots = [slot for slot in slots if slot.is_dropoff]
         pickup_slots = [slot for slot in slots if not slot.is_dropoff]
@@ -382,37 +541,146 @@ class ScheduleOptimizer:
         # Calculate times for drop-off slots
         for slot in dropoff_slots:
             school_start_time = datetime.combine(date_obj, slot.child.schools[0].normal_start)
-            dropoff_start_time = school_start_time - timedelta(minutes=15)  # Drop-off starts 15 minutes before school starts
-            slot.time = dropoff_start_time
-            slots_with_times.append(slot)
+            slot.time = school_start_time - timedelta(minutes=15)  # Drop-off starts 15 minutes before school starts
+        dropoff_slots.sort(key=lambda slot: slot.time)
         
         # Calculate times for pick-up slots
         for slot in pickup_slots:
             school_end_time = datetime.combine(date_obj, slot.child.schools[0].normal_end)
-            pickup_start_time = school_end_time - timedelta(minutes=5)  # Pick-up starts 5 minutes before school ends
-            slot.time = pickup_start_time
-            slots_with_times.append(slot)
+            slot.time = school_end_time - timedelta(minutes=5)  # Pick-up starts 5 minutes before school ends
+        pickup_slots.sort(key=lambda slot: slot.time)
+        
+        return dropoff_slots + pickup_slots
+
+    @staticmethod
+    def _minutes(t: time) -> int:
+        return t.hour * 60 + t.minute
+
+    def _solve_day_vrp(self, slots: List[ScheduleSlot],
+                       availability: Tuple[Tuple[str, Optional[Tuple[time, time]]], ...]) -> Tuple[int, Tuple[str, ...]]:
+        """Minimal total travel time for a day's slots, routing each parent's drop-off and pick-up runs.
+
+        Also returns the school and availability windows the runs miss, which is empty for a feasible day.
+        """
+        windows = dict(availability)
+        runs: Dict[Tuple[str, bool], List[ScheduleSlot]] = {}
+        for slot in slots:
+            runs.setdefault((slot.parent.name, slot.is_dropoff), []).append(slot)
         
-        return slots_with_times
-
-    def _calculate_total_journey_time(self, slots: List[ScheduleSlot]) -> int:
         total_time = 0
-        slots = sorted(slots, key=lambda x: x.time)
+        window_misses = ()
+        for (parent_name, is_dropoff), run_slots in runs.items():
+            # Fenella's school options only change the runs she is on, so key runs by their stops and solve each once
+            stops = tuple(sorted((slot.child.schools[0].name, slot.duration) for slot in run_slots))
+            run_time, run_misses = self._solve_run(parent_name, is_dropoff, stops, windows[parent_name])
+            if run_misses:
+                logger.debug("No feasible %s run for %s", 'drop-off' if is_dropoff else 'pick-up', parent_name)
+            total_time += run_time
+            window_misses += run_misses
+        return total_time, window_misses
+
+    @functools.lru_cache(maxsize=None)
+    def _solve_run(self, parent_name: str, is_dropoff: bool, stops_key: Tuple[Tuple[str, int], ...],
+                   window: Optional[Tuple[time, time]]) -> Tuple[int, Tuple[str, ...]]:
+        """Branch and bound over the order of one parent's school stops, starting and ending at home.
+
+        Each stop must be reached within its school's window (breakfast club to start for a drop-off, end
+        to aftercare for a pick-up), waiting if early; the whole run must fit the parent's availability.
+        The availability window is None if the parent is unavailable that day. Stops are (school name,
+        service minutes) pairs, so runs repeated across candidates are cached.
+        Returns the run time and the windows it misses: if no order meets every window, the shortest
+        order is kept and each window it misses is described.
+        """
+        parent = self.parents[parent_name]
+        run_name = f"{parent_name}'s {'drop-off' if is_dropoff else 'pick-up'} run"
+        window_misses = ()
+        if window is not None:
+            available_from, available_until = (self._minutes(t) for t in window)
+        else:
+            window_misses += (f"{run_name} falls on a day {parent_name} is not available",)
+            available_from, available_until = 0, 24 * 60
+        home = self._node_id[parent.address]
         
-        for i in range(len(slots) - 1):
-            start_slot = slots[i]
-            end_slot = slots[i + 1]
-            start_address = start_slot.child.schools[0].address if start_slot.is_dropoff else start_slot.parent.address
-            end_address = end_slot.child.schools[0].address if end_slot.is_dropoff else end_slot.parent.address
-            travel_time = self.calculate_journey_time(
-                start_location=start_address,
-                end_location=end_address,
-                arrival_time=end_slot.time
-            )
-            total_time += travel_time
-            logger.debug(f"Journey from {start_address} to {end_address}: {travel_time} minutes")
+        stops = []  # (node ID, window open, window close, service minutes)
+        for school_name, service in stops_key:
+            school = self.schools[school_name]
+            if is_dropoff:
+                school_window = (school.breakfast_club_start, school.normal_start)
+            else:
+                school_window = (school.normal_end, school.aftercare_end)
+            stops.append((self._node_id[school.address], self._minutes(school_window[0]),
+                          self._minutes(school_window[1]), service))
+        
+        # Fill any leg the search can use that is not in the table yet, concurrently in case any miss the cache
+        nodes = list(dict.fromkeys([home] + [stop[0] for stop in stops]))
+        dist = self._dist
+        missing = [leg for leg in itertools.product(nodes, repeat=2) if dist[leg[0]][leg[1]] < 0]
+        list(self.executor.map(lambda leg: self._travel(*leg), missing))
         
-        return total_time
+        # An unavailable parent misses the run whatever the order, so only search for the shortest one
+        if not window_misses:
+            best = self._best_run_time(dist, home, stops, available_from, available_until)
+            if best is not None:
+                return best[0], ()
+        run_time, order = self._best_run_time(dist, home, stops, available_from, available_until, enforce_windows=False)
+        
+        # Walk the shortest order to say which windows it misses
+        position, free_at = home, available_from
+        for i in order:
+            node, window_open, window_close, service = stops[i]
+            arrival = max(window_open, free_at + dist[position][node])
+            if arrival > window_close:
+                window_misses += (f"{run_name} reaches {stops_key[i][0]} at {self._clock(arrival)}, "
+                                  f"after its window closes at {self._clock(window_close)}",)
+            position, free_at = node, arrival + service
+        if free_at + dist[position][home] > available_until:
+            window_misses += (f"{run_name} gets home at {self._clock(free_at + dist[position][home])}, "
+                              f"after {parent_name} is available until {self._clock(available_until)}",)
+        return run_time, window_misses
+
+    @staticmethod
+    def _clock(minutes: int) -> str:
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    @staticmethod
+    def _best_run_time(dist: List[List[int]], home: int, stops: List[Tuple[int, int, int, int]],
+                       available_from: int, available_until: int,
+                       enforce_windows: bool = True) -> Optional[Tuple[int, Tuple[int, ...]]]:
+        """Search kernel for _solve_run: a depth-first loop over plain ints, with unvisited stops as a bitmask.
+
+        Returns the best run time and its order of stop indices, or None if no order meets the windows.
+        With enforce_windows off every order is allowed, so the shortest run is always found.
+        """
+        # Lower bound on what is left: the cheapest way into each remaining stop, plus the cheapest way home.
+        # A stop is entered from home or another stop, never itself; co-located stops legitimately cost 0.
+        min_into = [
+            min([dist[home][node]] + [dist[other[0]][node] for j, other in enumerate(stops) if j != i])
+            for i, (node, *_) in enumerate(stops)
+        ]
+        min_home = min(dist[stop[0]][home] for stop in stops)
+        best_time, best_order = None, ()
+        
+        # (route time, position, free from, unvisited bitmask, lower bound on the rest, stops so far)
+        stack = [(0, home, available_from, (1 << len(stops)) - 1, sum(min_into) + min_home, ())]
+        while stack:
+            route_time, position, free_at, remaining, lower_bound, order = stack.pop()
+            if best_time is not None and route_time + lower_bound >= best_time:
+                continue
+            if not remaining:
+                back_home = dist[position][home]
+                if ((not enforce_windows or free_at + back_home <= available_until)
+                        and (best_time is None or route_time + back_home < best_time)):
+                    best_time, best_order = route_time + back_home, order
+                continue
+            for i, (node, window_open, window_close, service) in enumerate(stops):
+                if not remaining >> i & 1:
+                    continue
+                leg = dist[position][node]
+                arrival = max(window_open, free_at + leg)
+                if arrival <= window_close or not enforce_windows:
+                    stack.append((route_time + leg, node, arrival + service, remaining & ~(1 << i),
+                                  lower_bound - min_into[i], order + (i,)))
+        return None if best_time is None else (best_time, best_order)
 
     def generate_possible_two_week_schedules(self) -> List[TwoWeekSchedule]:
         """Generate all possible two-week schedules within constraints."""
@@ -429,7 +697,7 @@ class ScheduleOptimizer:
                     day_schedule = day_schedule_list[0]
                     day_schedules.append(day_schedule)
                 else:
-                    logger.error(f"No valid schedule for {date_obj}")
+                    logger.error("No valid schedule for %s", date_obj)
                     return []
         
         total_journey_time = sum(day.total_journey_time for day in day_schedules)
@@ -466,17 +734,9 @@ class ScheduleOptimizer:
                 day_schedule = two_week_schedule.schedules[(week_number - 1) * 5 + day_index]
                 schedule_table['Date'].append(f"{week_days[week_number - 1]} {day_name}")
                 
-                # Fenella's overnight parent
-                fenella_overnight = self.children["Fenella"].custody_schedule[week_number][day_index]['Overnight'].name
-                schedule_table['Fenella'].append(fenella_overnight)
-                
-                # Ruby's overnight parent
-                ruby_overnight = self.children["Ruby"].custody_schedule[week_number][day_index]['Overnight'].name
-                schedule_table['Ruby'].append(ruby_overnight)
-                
-                # Teddy's overnight parent
-                teddy_overnight = self.children["Teddy"].custody_schedule[week_number][day_index]['Overnight'].name
-                schedule_table['Teddy'].append(teddy_overnight)
+                # Each child's overnight parent
+                for child_name in ("Fenella", "Ruby", "Teddy"):
+                    schedule_table[child_name].append(self._overnight_table[child_name][week_number - 1][day_index])
         
         # Print the schedule table
         print("\nSchedule Overview")
@@ -485,8 +745,24 @@ class ScheduleOptimizer:
         for i in range(len(schedule_table['Date'])):
             print(f"{schedule_table['Date'][i]:<15}{schedule_table['Fenella'][i]:<10}{schedule_table['Ruby'][i]:<10}{schedule_table['Teddy'][i]:<10}")
         print("-" * 70)
+        
+        # Days kept despite a run that cannot meet its school or availability window
+        window_misses = [
+            (date_label, window_miss)
+            for date_label, day_schedule in zip(schedule_table['Date'], two_week_schedule.schedules)
+            for window_miss in day_schedule.window_misses
+        ]
+        if window_misses:
+            print("\nWindow Conflicts")
+            print("-" * 70)
+            for date_label, window_miss in window_misses:
+                print(f"{date_label:<15}{window_miss}")
+            print("-" * 70)
 
     def run(self):
+        # Every journey is between a home and a school, so resolve them all in one batch up front
+        self.maps_client.prefetch_matrix(self._locations)
+
         possible_two_week_schedules = self.generate_possible_two_week_schedules()
         if not possible_two_week_schedules:
             print("No feasible two-week schedules found.")
@@ -501,7 +777,7 @@ def main():
         optimizer = ScheduleOptimizer()
         optimizer.run()
     except Exception as e:
-        logger.error(f"Error running optimizer: {str(e)}")
+        logger.error("Error running optimizer: %s", e)
         raise
 
 if __name__ == "__main__":